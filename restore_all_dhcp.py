@@ -3,9 +3,6 @@
 DHCP Recovery Script - Restore all lost server reservations to ASUS router
 """
 import asyncio
-import aiohttp
-from asusrouter import AsusRouter
-from asusrouter.modules.endpoint import EndpointControl
 
 # Server list from MobaXterm with MAC addresses from ARP table
 SERVERS_TO_RESTORE = [
@@ -69,8 +66,20 @@ SERVERS_TO_RESTORE = [
     ("", "192.168.1.128", "haproxy3"),
 ]
 
+# Partitioned once at load: entries with a known MAC (deduplicated, keyed by
+# lowercase MAC) and offline placeholders that can't be restored yet. The
+# restore loop then never has to branch on empty MACs.
+KNOWN_MACS = {mac.lower(): (ip, name) for mac, ip, name in SERVERS_TO_RESTORE if mac}
+PLACEHOLDERS = tuple((ip, name) for mac, ip, name in SERVERS_TO_RESTORE if not mac)
+
 async def restore_dhcp():
     """Restore all DHCP reservations"""
+    # Imported here so loading this module (e.g. for SERVERS_TO_RESTORE)
+    # doesn't pay the aiohttp/asusrouter import cost
+    import aiohttp
+    from asusrouter import AsusRouter
+    from asusrouter.modules.endpoint import EndpointControl
+
     router_host = "192.168.1.1"
     router_user = "camaro4life18"
     router_pass = "camaro4life18"
@@ -112,41 +121,48 @@ async def restore_dhcp():
                         })
         
         print(f"[*] Parsed {len(reservations)} existing reservations")
-        
+
+        # Index existing reservations once so the "already exists?" check is
+        # an O(1) lookup instead of a scan per server
+        existing_macs = {r["mac"].lower() for r in reservations}
+        existing_ips = {r["ip"] for r in reservations}
+
+        # Offline hosts (no MAC) can't be restored
+        for ip, name in PLACEHOLDERS:
+            print(f"[!] SKIP: {name} ({ip}) - MAC unknown (offline)")
+        skipped_count = len(PLACEHOLDERS)
+
         # Add new servers
         added_count = 0
-        skipped_count = 0
-        
-        for mac, ip, name in SERVERS_TO_RESTORE:
-            # Skip if no MAC (offline)
-            if not mac:
-                print(f"[!] SKIP: {name} ({ip}) - MAC unknown (offline)")
-                skipped_count += 1
-                continue
-            
+
+        for mac_lower, (ip, name) in KNOWN_MACS.items():
             # Check if already exists
-            exists = False
-            for res in reservations:
-                if res["mac"].lower() == mac.lower() or res["ip"] == ip:
-                    print(f"[+] ALREADY: {name} ({ip}) - {mac}")
-                    exists = True
-                    break
-            
-            if not exists:
-                reservations.append({
-                    "mac": mac.upper(),
-                    "ip": ip,
-                    "name": name
-                })
-                print(f"[+] ADDED: {name} ({ip}) - {mac}")
-                added_count += 1
+            if mac_lower in existing_macs or ip in existing_ips:
+                print(f"[+] ALREADY: {name} ({ip}) - {mac_lower}")
+                continue
+
+            reservations.append({
+                "mac": mac_lower.upper(),
+                "ip": ip,
+                "name": name
+            })
+            existing_macs.add(mac_lower)
+            existing_ips.add(ip)
+            print(f"[+] ADDED: {name} ({ip}) - {mac_lower}")
+            added_count += 1
         
+        # Nothing new - don't rewrite the staticlist or bounce dhcpd
+        if added_count == 0:
+            print(f"\n[✓] All {len(reservations)} reservations already present - nothing to send")
+            print(f"    - Skipped (offline): {skipped_count}")
+            return
+
         # Format and send back
         staticlist = "\t".join(
             f"{r['mac']}:{r['ip']}:{r.get('name', '')}"
             for r in reservations
         )
-        
+
         print(f"\n[*] Sending {len(reservations)} total reservations to router...")
         print(f"[*] Staticlist size: {len(staticlist)} bytes")
         
@@ -1,220 +1,395 @@
 import asyncio
+import functools
+import logging
 import os
-from typing import Any, Dict, List, Optional
+import re
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
 
 import aiohttp
-from flask import Flask, jsonify, request
+from quart import Quart, jsonify, request
+from quart.json.provider import DefaultJSONProvider
 
 from asusrouter import AsusRouter
+from asusrouter.error import AsusRouterAccessError
 from asusrouter.modules.endpoint import EndpointControl
 
-app = Flask(__name__)
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
 
 
-def run_async(coro):
-    try:
-        return asyncio.run(coro)
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        try:
-            return loop.run_until_complete(coro)
-        finally:
-            loop.close()
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster response serialization."""
+
+    def dumps(self, object_: Any, **kwargs: Any) -> str:
+        return orjson.dumps(object_).decode()
+
+    def loads(self, object_: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(object_)
+
+
+app = Quart(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# All diagnostic output goes through this logger. The parse/format/update
+# helpers run on every request, so the verbose per-step messages are DEBUG
+# level and their arguments are only formatted when DEBUG is enabled.
+# Configured at import so it applies under hypercorn as well as 'python
+# app.py'; basicConfig is a no-op if the host process already set handlers.
+logging.basicConfig(
+    level=os.getenv("DHCP_LOG_LEVEL", "INFO"),
+    format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
+)
+log = logging.getLogger("dhcp")
+
+# How long an authenticated router session is reused before we force a fresh
+# login. Router-side web sessions expire on their own; keep ours shorter.
+_ROUTER_TTL = float(os.getenv("ROUTER_SESSION_TTL", "300"))
+
+# Cache of logged-in routers keyed by (host, username, use_ssl). Each entry
+# holds the AsusRouter, its aiohttp session, the loop it was created on, an
+# expiry timestamp and a lock serializing commands against that router.
+_ROUTER_POOL: Dict[tuple, Dict[str, Any]] = {}
+
+# Per-key locks guarding pool entry creation. Without them, concurrent first
+# requests for the same router each perform a login and all but one of the
+# resulting sessions leaks (a login storm on the router, too).
+_POOL_LOCKS: Dict[tuple, asyncio.Lock] = {}
+
+
+def _pool_lock(key: tuple) -> asyncio.Lock:
+    lock = _POOL_LOCKS.get(key)
+    if lock is None:
+        lock = _POOL_LOCKS[key] = asyncio.Lock()
+    return lock
+
+# One TCP connector shared by every pooled session so TLS connections, DNS
+# cache entries and keep-alive sockets are reused even across re-logins.
+# Created lazily because a connector binds to the running event loop.
+_CONNECTOR: Optional[aiohttp.TCPConnector] = None
+
+
+def _get_connector() -> aiohttp.TCPConnector:
+    global _CONNECTOR
+    if _CONNECTOR is None or _CONNECTOR.closed:
+        # All traffic goes to the admin's router(s), so a small pool with a
+        # long keep-alive beats the defaults: one warm TLS connection stays
+        # open between polls and DNS answers are reused.
+        _CONNECTOR = aiohttp.TCPConnector(
+            limit=8,
+            limit_per_host=8,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            keepalive_timeout=120,
+            enable_cleanup_closed=True,
+        )
+    return _CONNECTOR
+
+
+# Routers answer on the LAN; anything slower than this is a failure worth
+# surfacing rather than a request worth queuing.
+_CLIENT_TIMEOUT = aiohttp.ClientTimeout(total=30, connect=5)
+
+
+# Remembers which response shape the router's firmware uses so repeat calls
+# to _extract_staticlist become a single lookup. Reset whenever the cached
+# accessor no longer fits the data.
+_EXTRACT_PATH: Optional[Any] = None
 
 
 def _extract_staticlist(data: Any) -> str:
     """Extract dhcp_staticlist from various response formats.
-    
+
     The router API can return data in different formats:
     1. Direct dict with "dhcp_staticlist" key
     2. Nested under "nvram_get"
     3. Other key variations
-    
+
+    The winning accessor is cached: for a given firmware the shape is
+    constant across the process lifetime, so after the first successful
+    detection each call is one dict lookup.
+
     CRITICAL: If extraction fails or returns empty, this could lead to data loss
     if the caller doesn't verify the result!
     """
+    global _EXTRACT_PATH
+
+    if _EXTRACT_PATH is not None:
+        try:
+            return _EXTRACT_PATH(data) or ""
+        except (KeyError, TypeError):
+            log.debug("_extract_staticlist: Cached accessor no longer matches, re-detecting")
+            _EXTRACT_PATH = None
+
+    if not isinstance(data, dict):
+        log.error("_extract_staticlist: dhcp_staticlist NOT FOUND in response!")
+        log.error("_extract_staticlist: Response structure: %s", type(data).__name__)
+        log.error("_extract_staticlist: This WILL cause data loss if caller doesn't verify result!")
+        log.error("_extract_staticlist: Full response: %s", data)
+        return ""
+
     result = ""
-    
-    if isinstance(data, dict):
-        # Try direct key first
-        if "dhcp_staticlist" in data:
-            result = data.get("dhcp_staticlist") or ""
-            print(f"[DHCP] _extract_staticlist: Found at top level (length: {len(result)})")
+
+    # Try direct key first
+    if "dhcp_staticlist" in data:
+        result = data.get("dhcp_staticlist") or ""
+        log.debug("_extract_staticlist: Found at top level (length: %d)", len(result))
+        if not result:
+            log.warning("_extract_staticlist: Value is empty/null at top level")
+        _EXTRACT_PATH = lambda d: d["dhcp_staticlist"]
+        return result
+
+    # Try nested under nvram_get
+    if "nvram_get" in data and isinstance(data.get("nvram_get"), dict):
+        nested = data.get("nvram_get")
+        if nested and "dhcp_staticlist" in nested:
+            result = nested.get("dhcp_staticlist") or ""
+            log.debug("_extract_staticlist: Found in nvram_get (length: %d)", len(result))
+            if not result:
+                log.warning("_extract_staticlist: Value is empty/null in nvram_get")
+            _EXTRACT_PATH = lambda d: d["nvram_get"]["dhcp_staticlist"]
+            return result
+
+    # Last resort for unknown schemas: any string key containing
+    # dhcp_staticlist. API keys are already lowercase strings, so no
+    # str()/lower() allocations per key.
+    for key, value in data.items():
+        if isinstance(key, str) and "dhcp_staticlist" in key:
+            result = value or ""
+            log.debug("_extract_staticlist: Found in key '%s' (length: %d)", key, len(result))
             if not result:
-                print(f"[DHCP] _extract_staticlist: ⚠️  Value is empty/null at top level")
+                log.warning("_extract_staticlist: Value is empty/null in '%s'", key)
+            _EXTRACT_PATH = lambda d, k=key: d[k]
             return result
-            
-        # Try nested under nvram_get
-        if "nvram_get" in data and isinstance(data.get("nvram_get"), dict):
-            nested = data.get("nvram_get")
-            if nested and "dhcp_staticlist" in nested:
-                result = nested.get("dhcp_staticlist") or ""
-                print(f"[DHCP] _extract_staticlist: Found in nvram_get (length: {len(result)})")
-                if not result:
-                    print(f"[DHCP] _extract_staticlist: ⚠️  Value is empty/null in nvram_get")
-                return result
-        
-        # Try any key containing dhcp_staticlist
-        for key, value in data.items():
-            if "dhcp_staticlist" in str(key).lower():
-                result = value or ""
-                print(f"[DHCP] _extract_staticlist: Found in key '{key}' (length: {len(result)})")
-                if not result:
-                    print(f"[DHCP] _extract_staticlist: ⚠️  Value is empty/null in '{key}'")
-                return result
-    
+
     # Warn if data not found - this is critical!
-    data_keys = list(data.keys()) if isinstance(data, dict) else type(data).__name__
-    print(f"[DHCP] _extract_staticlist: ❌ CRITICAL - dhcp_staticlist NOT FOUND in response!")
-    print(f"[DHCP] _extract_staticlist: Response structure: {data_keys}")
-    print(f"[DHCP] _extract_staticlist: This WILL cause data loss if caller doesn't verify result!")
-    print(f"[DHCP] _extract_staticlist: Full response: {data}")
-    
+    log.error("_extract_staticlist: dhcp_staticlist NOT FOUND in response!")
+    log.error("_extract_staticlist: Response structure: %s", list(data.keys()))
+    log.error("_extract_staticlist: This WILL cause data loss if caller doesn't verify result!")
+    log.error("_extract_staticlist: Full response: %s", data)
+
     return ""
 
 
-def _parse_staticlist(raw: str) -> List[Dict[str, str]]:
+class Reservation(NamedTuple):
+    """One DHCP reservation. A compact immutable record instead of a dict per
+    entry; convert with ._asdict() only at the JSON boundary."""
+
+    mac: str
+    ip: str
+    name: str
+
+
+def _parse_staticlist(raw: str) -> List[Reservation]:
     """Parse dhcp_staticlist from router into individual reservations.
-    
+
     Supports multiple formats:
     - MAC:IP:name\tMAC:IP:name\t... (preferred)
     - <MAC>IP>name (legacy)
     - Other separators
+
+    Results are memoized: the staticlist rarely changes between consecutive
+    polls, so repeat calls with the same raw string skip the parse entirely.
+    A fresh list is returned each time so callers can replace entries safely.
     """
-    reservations: List[Dict[str, str]] = []
-    
-    if not raw or not raw.strip():
-        print(f"[DHCP] _parse_staticlist: Raw is empty or whitespace")
-        return reservations
-    
-    print(f"[DHCP] _parse_staticlist: Input length: {len(raw)} bytes, first 200 chars: {repr(raw[:200])}")
-    
-    # Try format 1: <MAC>IP>NAME delimited (legacy)
-    if "<" in raw and ">" in raw:
-        print(f"[DHCP] _parse_staticlist: Attempting <> delimiter format")
+    return list(_parse_staticlist_cached(raw))
+
+
+# Normalizes the alternative entry separators to tab so the modern format is
+# split exactly once, regardless of which separator the firmware used.
+_SEP_TABLE = str.maketrans({";": "\t", "\n": "\t"})
+
+# Matches one legacy-format entry: <MAC>IP>name
+_LEGACY_RE = re.compile(r"<([^>]+)>([^>]+)>([^<]*)")
+
+# A canonical MAC address: six colon-separated hex octets
+_MAC_RE = re.compile(r"^[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}$")
+
+# Same shape at the start of an entry, followed by the field separator
+_MAC_PREFIX_RE = re.compile(r"[0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}:")
+
+# A whole canonical entry (MAC:IP[:name]) at an entry boundary, after the
+# separators have been normalized to tab. The IP field must be non-empty so
+# entries like MAC::name fail the match and take the tolerant loop, which
+# skips them the same way the fallback's mac-and-ip check does.
+_ENTRY_RE_COLON = re.compile(
+    r"(?:^|\t)([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5}):([^:\t]+):?([^\t]*)"
+)
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_staticlist_cached(raw: str) -> tuple:
+    stripped = raw.strip() if raw else ""
+    if not stripped:
+        log.debug("_parse_staticlist: Raw is empty or whitespace")
+        return ()
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            "_parse_staticlist: Input length: %d bytes, first 200 chars: %r",
+            len(raw), raw[:200],
+        )
+
+    # Format 1: <MAC>IP>NAME delimited (legacy). Entries always begin with '<',
+    # so one look at the first character replaces scanning the whole string.
+    if stripped[0] == "<":
+        log.debug("_parse_staticlist: Attempting <> delimiter format")
         try:
-            entries_raw = raw.split("<")
-            for entry in entries_raw:
-                if not entry or not entry.strip():
-                    continue
-                parts = entry.split(">")
-                if len(parts) >= 3:
-                    mac = parts[0].strip().upper()
-                    ip = parts[1].strip()
-                    name = parts[2].strip()
-                    if mac and ip:
-                        reservations.append({"mac": mac, "ip": ip, "name": name})
-            
-            if reservations:
-                print(f"[DHCP] _parse_staticlist: Successfully parsed {len(reservations)} entries using <> format")
-                return reservations
+            # Stream matches straight into the result - no intermediate list
+            # of split fragments, one allocation per parsed entry
+            parsed = tuple(
+                Reservation(mac, m.group(2).strip(), m.group(3).strip())
+                for m in _LEGACY_RE.finditer(stripped)
+                if (mac := m.group(1).strip().upper()) and m.group(2).strip()
+            )
+            if parsed:
+                log.debug("_parse_staticlist: Parsed %d entries using <> format", len(parsed))
+                return parsed
         except Exception as e:
-            print(f"[DHCP] _parse_staticlist: Error parsing <> format: {e}")
-    
-    # Try format 2: MAC:IP:NAME with tab/semicolon/newline separators
-    if ":" in raw:
-        print(f"[DHCP] _parse_staticlist: Attempting colon:separator format")
-        
-        # Detect separator
-        separator = None
-        if "\t" in raw:
-            separator = "\t"
-            print(f"[DHCP] _parse_staticlist: Detected TAB separator")
-        elif ";" in raw:
-            separator = ";"
-            print(f"[DHCP] _parse_staticlist: Detected SEMICOLON separator")
-        elif "\n" in raw:
-            separator = "\n"
-            print(f"[DHCP] _parse_staticlist: Detected NEWLINE separator")
-        elif " " in raw and raw.count(" ") > raw.count(":"):
-            # More spaces than colons suggests space separator
-            separator = " "
-            print(f"[DHCP] _parse_staticlist: Detected SPACE separator")
-        else:
-            # Single entry or unknown format
-            print(f"[DHCP] _parse_staticlist: No separator found, treating as single entry")
-            separator = None
-        
+            log.warning("_parse_staticlist: Error parsing <> format: %s", e)
+
+    # Format 2: MAC:IP:NAME entries. Fold tab/semicolon/newline separators into
+    # one with a translate pass, then split exactly once instead of probing
+    # each candidate separator with its own full-string scan.
+    if ":" in stripped:
+        normalized = stripped.translate(_SEP_TABLE)
+
+        # Fast path: when every entry is canonical (full MAC, at an entry
+        # boundary) the whole list is consumed by one C-level findall. The
+        # count guard falls back to the tolerant loop if anything - a
+        # malformed MAC, an empty segment - didn't match cleanly.
+        found = _ENTRY_RE_COLON.findall(normalized)
+        if found and len(found) == normalized.count("\t") + 1:
+            log.debug("_parse_staticlist: Parsed %d entries via fast path", len(found))
+            return tuple(
+                Reservation(m.upper(), i.strip(), n.strip())
+                for m, i, n in found
+            )
+
+        entries_raw = normalized.split("\t")
+        if len(entries_raw) == 1 and " " in stripped and stripped.count(" ") > stripped.count(":"):
+            # More spaces than colons suggests space-separated entries
+            log.debug("_parse_staticlist: Detected SPACE separator")
+            entries_raw = stripped.split(" ")
+
+        # Tolerant fallback: kept as an explicit loop because each entry
+        # takes one of several parse branches and may log a skip
+        reservations: List[Reservation] = []
         try:
-            if separator:
-                entries_raw = raw.split(separator)
-            else:
-                entries_raw = [raw]
-            
             for entry in entries_raw:
-                if not entry or not entry.strip():
+                entry = entry.strip()
+                if not entry:
                     continue
-                
-                parts = entry.split(":")
-                if len(parts) >= 2:
-                    mac = parts[0].strip().upper()
-                    ip = parts[1].strip()
-                    name = parts[2].strip() if len(parts) > 2 else ""
-                    
-                    # Validate MAC and IP format
-                    if mac and ip:
-                        reservations.append({"mac": mac, "ip": ip, "name": name})
-                    else:
-                        print(f"[DHCP] _parse_staticlist: Skipping invalid entry (no MAC or IP): {entry}")
-            
+
+                # Peel off MAC, IP and name with partition (two C-level finds,
+                # no intermediate list). A full six-octet MAC contains colons
+                # itself, so recognize that shape up front and take it whole.
+                if _MAC_PREFIX_RE.match(entry):
+                    mac = entry[:17].upper()
+                    ip, _, name = entry[18:].partition(":")
+                else:
+                    mac, _, rest = entry.partition(":")
+                    ip, _, name = rest.partition(":")
+                    mac = mac.strip().upper()
+
+                ip = ip.strip()
+                name = name.strip()
+
+                # Validate MAC and IP format
+                if mac and ip:
+                    reservations.append(Reservation(mac, ip, name))
+                else:
+                    log.debug("_parse_staticlist: Skipping invalid entry (no MAC or IP): %s", entry)
+
             if reservations:
-                print(f"[DHCP] _parse_staticlist: Successfully parsed {len(reservations)} entries using colon format")
-                return reservations
+                log.debug("_parse_staticlist: Parsed %d entries using colon format", len(reservations))
+                return tuple(reservations)
         except Exception as e:
-            print(f"[DHCP] _parse_staticlist: Error parsing colon format: {e}")
-    
+            log.warning("_parse_staticlist: Error parsing colon format: %s", e)
+
     # If we get here, we couldn't parse anything
-    print(f"[DHCP] _parse_staticlist: WARNING - Could not parse any entries from raw data")
-    print(f"[DHCP] _parse_staticlist: Parsed 0 entries")
-    
-    return reservations
+    log.warning("_parse_staticlist: Could not parse any entries from raw data")
+
+    return ()
 
 
-def _format_staticlist(reservations: List[Dict[str, str]]) -> str:
+def _format_staticlist(reservations: List[Reservation]) -> str:
     """Format reservations back to router dhcp_staticlist format.
-    
+
     Uses MAC:IP:name with tab separators (no trailing tab).
-    
+
     Args:
-        reservations: List of reservation dicts with 'mac', 'ip', 'name' keys
-        
+        reservations: List of Reservation records
+
     Returns:
         Formatted string ready for router API
     """
     if not reservations:
-        print(f"[DHCP] _format_staticlist: No reservations to format")
+        log.debug("_format_staticlist: No reservations to format")
         return ""
-    
-    # Build entries, filtering out any with missing MAC or IP
+
+    # Serialization is pure, so memoize on the tuple form: repeated formats
+    # of the same list (e.g. back-to-back adds that end up no-ops) skip the
+    # whole strip/validate/join pass.
+    return _format_tuple(tuple(reservations))
+
+
+@functools.lru_cache(maxsize=8)
+def _format_tuple(reservations: tuple) -> str:
+    # Build entries, filtering out any with missing MAC or IP. One f-string
+    # per entry plus a single str.join measured faster here than the flat
+    # field-list + "".join variant, so keep the simpler idiom.
     entries = []
-    for r in reservations:
-        mac = r.get('mac', '').strip()
-        ip = r.get('ip', '').strip()
-        name = r.get('name', '').strip()
-        
+    append = entries.append
+    for mac, ip, name in reservations:
+        mac = mac.strip()
+        ip = ip.strip()
+        name = name.strip()
+
         if not mac or not ip:
-            print(f"[DHCP] _format_staticlist: Skipping entry with missing MAC or IP: {r}")
+            log.debug("_format_staticlist: Skipping entry with missing MAC or IP: %s:%s:%s", mac, ip, name)
             continue
-        
+
         # Validate MAC format (should be XX:XX:XX:XX:XX:XX)
-        if mac.count(':') != 5:
-            print(f"[DHCP] _format_staticlist: WARNING - Invalid MAC format: {mac}")
-        
-        entries.append(f"{mac}:{ip}:{name}")
-    
+        if not _MAC_RE.match(mac):
+            log.warning("_format_staticlist: Invalid MAC format: %s", mac)
+
+        append(f"{mac}:{ip}:{name}")
+
     # Join with tabs (no trailing tab)
     result = "\t".join(entries)
-    
-    print(f"[DHCP] _format_staticlist: Input reservations: {len(reservations)}")
-    print(f"[DHCP] _format_staticlist: Valid entries: {len(entries)}")
-    print(f"[DHCP] _format_staticlist: Output length: {len(result)} bytes")
-    print(f"[DHCP] _format_staticlist: First 200 chars: {repr(result[:200])}")
-    
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            "_format_staticlist: %d reservations in, %d valid entries, %d bytes out, first 200 chars: %r",
+            len(reservations), len(entries), len(result), result[:200],
+        )
+
     return result
 
 
-async def _with_router(host: str, username: str, password: str, use_ssl: bool, fn):
-    session = aiohttp.ClientSession()
+async def _close_entry(entry: Dict[str, Any]) -> None:
+    """Best-effort disconnect + session close for a pool entry."""
+    try:
+        await entry["router"].async_disconnect()
+    except Exception as e:
+        log.warning("Error disconnecting router: %s", e)
+    try:
+        await entry["session"].close()
+    except Exception as e:
+        log.warning("Error closing session: %s", e)
+
+
+async def _login(host: str, username: str, password: str, use_ssl: bool) -> Dict[str, Any]:
+    """Create a session, log into the router and return a fresh pool entry."""
+    session = aiohttp.ClientSession(
+        connector=_get_connector(),
+        connector_owner=False,
+        timeout=_CLIENT_TIMEOUT,
+    )
     router = AsusRouter(
         hostname=host,
         username=username,
@@ -222,41 +397,134 @@ async def _with_router(host: str, username: str, password: str, use_ssl: bool, f
         use_ssl=use_ssl,
         session=session,
     )
-
     try:
         await router.async_connect()
-        result = await fn(router)
-        return result
-    finally:
-        try:
-            await router.async_disconnect()
-        except Exception as e:
-            print(f"Error disconnecting router: {e}")
-        try:
-            await session.close()
-        except Exception as e:
-            print(f"Error closing session: {e}")
+    except Exception:
+        await session.close()
+        raise
+    return {
+        "router": router,
+        "session": session,
+        "loop": asyncio.get_running_loop(),
+        "expires": time.monotonic() + _ROUTER_TTL,
+        "lock": asyncio.Lock(),
+    }
+
+
+async def _get_or_login(host: str, username: str, password: str, use_ssl: bool) -> Dict[str, Any]:
+    """Return a cached logged-in router for these credentials, logging in if needed."""
+    key = (host, username, use_ssl)
+
+    async with _pool_lock(key):
+        entry = _ROUTER_POOL.get(key)
+
+        if entry is not None:
+            # Entries are only reusable on the loop that created them (the aiohttp
+            # connector is bound to it) and before their TTL runs out.
+            stale = (
+                entry["loop"] is not asyncio.get_running_loop()
+                or entry["session"].closed
+                or time.monotonic() >= entry["expires"]
+            )
+            if stale:
+                _ROUTER_POOL.pop(key, None)
+                await _close_entry(entry)
+                entry = None
+
+        if entry is None:
+            entry = await _login(host, username, password, use_ssl)
+            _ROUTER_POOL[key] = entry
+
+        entry["expires"] = time.monotonic() + _ROUTER_TTL
+        return entry
+
+
+async def _with_router(host: str, username: str, password: str, use_ssl: bool, fn):
+    key = (host, username, use_ssl)
+    retried = False
+
+    while True:
+        entry = await _get_or_login(host, username, password, use_ssl)
+
+        async with entry["lock"]:
+            # While we waited on the lock, another request's re-login may have
+            # torn this entry down; its session is closed then and calling fn
+            # on it raises a bare RuntimeError that would escape the retry.
+            # Go back through _get_or_login for the replacement entry instead.
+            if entry["session"].closed:
+                continue
+            try:
+                return await fn(entry["router"])
+            except AsusRouterAccessError:
+                if retried:
+                    raise
+                retried = True
+                # Router-side session expired; drop the cached login and retry
+                # once. Only tear the entry down if it is still the pooled one:
+                # a concurrent request may already have replaced (and closed)
+                # it, and its fresh login should be reused, not overwritten.
+                log.info("_with_router: Auth expired for %s, re-logging in...", host)
+                async with _pool_lock(key):
+                    if _ROUTER_POOL.get(key) is entry:
+                        _ROUTER_POOL.pop(key, None)
+                        await _close_entry(entry)
+        # Retry runs through the loop so fn executes under the fresh
+        # entry's lock, keeping commands per router serialized.
+
+
+@app.after_serving
+async def _close_pool() -> None:
+    """Close all cached router sessions when the server shuts down."""
+    for entry in list(_ROUTER_POOL.values()):
+        await _close_entry(entry)
+    _ROUTER_POOL.clear()
+    if _CONNECTOR is not None and not _CONNECTOR.closed:
+        await _CONNECTOR.close()
+
+
+# Recently fetched reservation lists, keyed like the router pool. NVRAM only
+# changes when something writes it, so UI polls a few seconds apart can share
+# one router round-trip; the add paths invalidate their key after a write and
+# ?fresh=1 on the request bypasses the cache entirely.
+_RESERVATIONS_TTL = float(os.getenv("RESERVATIONS_CACHE_TTL", "5"))
+_RESERVATIONS_CACHE: Dict[tuple, tuple] = {}
+
+
+async def _get_reservations(
+    host: str, username: str, password: str, use_ssl: bool, fresh: bool = False
+):
+    """Retrieve current DHCP reservations from router.
 
+    Results are cached for a few seconds per router; pass fresh=True to
+    force a fetch.
+    """
+    key = (host, username, use_ssl)
+    if not fresh:
+        cached = _RESERVATIONS_CACHE.get(key)
+        if cached is not None and time.monotonic() < cached[0]:
+            log.debug("_get_reservations: Returning cached list for %s", host)
+            return list(cached[1])
 
-async def _get_reservations(host: str, username: str, password: str, use_ssl: bool):
-    """Retrieve current DHCP reservations from router."""
     async def _fetch(router: AsusRouter):
-        print(f"[DHCP] _fetch: Fetching dhcp_staticlist from router...")
+        log.debug("_fetch: Fetching dhcp_staticlist from router...")
         try:
             data = await router.async_api_hook("nvram_get(dhcp_staticlist)")
             raw = _extract_staticlist(data)
             reservations = _parse_staticlist(raw)
-            print(f"[DHCP] _fetch: Retrieved {len(reservations)} reservations")
-            for i, res in enumerate(reservations[:5]):
-                print(f"[DHCP] _fetch:   [{i}] {res['mac']} -> {res['ip']} ({res.get('name', '')})")
-            if len(reservations) > 5:
-                print(f"[DHCP] _fetch:   ... and {len(reservations) - 5} more")
+            log.debug("_fetch: Retrieved %d reservations", len(reservations))
+            if log.isEnabledFor(logging.DEBUG):
+                for i, res in enumerate(reservations[:5]):
+                    log.debug("_fetch:   [%d] %s -> %s (%s)", i, res.mac, res.ip, res.name)
+                if len(reservations) > 5:
+                    log.debug("_fetch:   ... and %d more", len(reservations) - 5)
             return reservations
         except Exception as e:
-            print(f"[DHCP] _fetch: ERROR - {e}")
+            log.error("_fetch: ERROR - %s", e)
             raise
 
-    return await _with_router(host, username, password, use_ssl, _fetch)
+    reservations = await _with_router(host, username, password, use_ssl, _fetch)
+    _RESERVATIONS_CACHE[key] = (time.monotonic() + _RESERVATIONS_TTL, tuple(reservations))
+    return reservations
 
 
 async def _add_reservation(
@@ -269,116 +537,248 @@ async def _add_reservation(
     name: str,
 ):
     """Add a DHCP reservation to the router without modifying existing ones.
-    
+
     This function:
     1. Fetches current DHCP staticlist from router (raw)
     2. Appends new entry directly to the raw string
     3. Sends back to router
-    
+
     CRITICAL: We do NOT parse/modify existing entries - just append the new one.
     This prevents data loss if parsing fails or format changes.
     """
-    print(f"[DHCP] _add_reservation: Adding/updating {mac} -> {ip} ({name})")
-    
+    log.info("_add_reservation: Adding/updating %s -> %s (%s)", mac, ip, name)
+
     async def _update(router: AsusRouter):
-        print(f"[DHCP] _update: Step 1 - Fetching current dhcp_staticlist from router...")
-        
+        log.debug("_update: Step 1 - Fetching current dhcp_staticlist from router...")
+
         try:
             data = await router.async_api_hook("nvram_get(dhcp_staticlist)")
-            print(f"[DHCP] _update: Router API returned: {type(data).__name__}")
+            log.debug("_update: Router API returned: %s", type(data).__name__)
         except Exception as e:
-            print(f"[DHCP] _update: ERROR fetching from router: {e}")
+            log.error("_update: ERROR fetching from router: %s", e)
             raise
-        
+
         raw = _extract_staticlist(data)
-        print(f"[DHCP] _update: Step 2 - Extracted staticlist: {len(raw)} bytes")
-        
+        log.debug("_update: Step 2 - Extracted staticlist: %d bytes", len(raw))
+
         # SAFETY CHECK: Verify data looks valid before saving
         # If raw is empty, this might be a parsing error - log the raw data for debugging
         if len(raw) == 0:
-            print(f"[DHCP] _update: ⚠️  WARNING - Extracted EMPTY dhcp_staticlist from router!")
-            print(f"[DHCP] _update: Raw response data structure: {data}")
-            print(f"[DHCP] _update: This could indicate:")
-            print(f"[DHCP] _update:   1. No existing reservations on router (OK if first time)")
-            print(f"[DHCP] _update:   2. API response format changed (contact developer if problem persists)")
-            print(f"[DHCP] _update:   3. Extraction parsing logic needs updating")
-        
+            log.warning("_update: Extracted EMPTY dhcp_staticlist from router!")
+            log.warning("_update: Raw response data structure: %s", data)
+            log.warning(
+                "_update: This could indicate: no existing reservations (OK if first time), "
+                "a changed API response format, or stale extraction logic"
+            )
+
         mac_normalized = mac.upper()
-        
-        # Check if this MAC already exists in the raw string (simple substring check)
-        # Look for MAC:IP:name pattern
-        mac_search = f"{mac_normalized}:"
-        if mac_search in raw:
-            print(f"[DHCP] _update: Step 3 - Found existing entry for {mac_normalized}, updating it...")
-            # Simple approach: parse just enough to find and replace the entry
-            entries_raw = raw.split("\t")
-            updated = False
-            
-            for i, entry in enumerate(entries_raw):
-                if entry.startswith(mac_normalized + ":"):
-                    print(f"[DHCP] _update: Replacing: {entry}")
-                    entries_raw[i] = f"{mac_normalized}:{ip}:{name}"
-                    print(f"[DHCP] _update: With: {entries_raw[i]}")
-                    updated = True
-                    break
-            
-            if updated:
-                raw = "\t".join(entries_raw)
+
+        # Write back in whatever format the router answered with: splicing a
+        # tab/colon entry into a legacy <MAC>IP>name list (or vice versa)
+        # would hand the firmware a corrupted mix of both formats.
+        if _staticlist_is_legacy(raw):
+            entry_to_send = f"<{mac_normalized}>{ip}>{name}"
+            mac_search = f"<{mac_normalized}>"
+            start = raw.find(mac_search)
+            entry_end_sep, entry_sep = "<", ""
+        else:
+            entry_to_send = f"{mac_normalized}:{ip}:{name}"
+            # A real entry starts at the beginning of the string or right
+            # after a tab; matches anywhere else (e.g. inside a name field)
+            # are skipped.
+            mac_search = f"{mac_normalized}:"
+            start = raw.find(mac_search)
+            while start > 0 and raw[start - 1] != "\t":
+                start = raw.find(mac_search, start + 1)
+            entry_end_sep, entry_sep = "\t", "\t"
+
+        # Locate an existing entry for this MAC by offset instead of splitting
+        # the whole staticlist into a list and rejoining it.
+        if start != -1:
+            end = raw.find(entry_end_sep, start + 1)
+            if end == -1:
+                end = len(raw)
+
+            # Idempotent re-add: if the entry already matches exactly, skip
+            # the router command entirely - restart_dhcpd is the expensive
+            # part and bounces every lease on the LAN.
+            if raw[start:end] == entry_to_send:
+                log.info("_update: Reservation for %s already current, skipping dhcpd restart", mac_normalized)
+                return True
+
+            log.debug("_update: Step 3 - Found existing entry for %s, updating it...", mac_normalized)
+            log.debug("_update: Replacing: %s with %s", raw[start:end], entry_to_send)
+            raw = raw[:start] + entry_to_send + raw[end:]
         else:
-            print(f"[DHCP] _update: Step 3 - MAC {mac_normalized} not found, appending new entry...")
-            # Simply append the new entry
-            # Use tab separator, but only if raw is not empty
+            log.debug("_update: Step 3 - MAC %s not found, appending new entry...", mac_normalized)
+            # Simply append the new entry, with a separator only if raw is
+            # not empty (legacy entries are self-delimiting)
             if raw:
-                raw = f"{raw}\t{mac_normalized}:{ip}:{name}"
+                raw = f"{raw}{entry_sep}{entry_to_send}"
             else:
-                raw = f"{mac_normalized}:{ip}:{name}"
-            print(f"[DHCP] _update: Appended new entry")
-        
-        print(f"[DHCP] _update: Step 4 - Final staticlist: {len(raw)} bytes")
-        print(f"[DHCP] _update: Content (first 200 chars): {repr(raw[:200])}")
-        
+                raw = entry_to_send
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug(
+                "_update: Step 4 - Final staticlist: %d bytes, first 200 chars: %r",
+                len(raw), raw[:200],
+            )
+
         if not raw:
             raise ValueError("[DHCP] _update: Final staticlist is empty - refusing to write!")
-        
+
         # SAFETY CHECK: Verify the final staticlist contains our new entry
         # to ensure we didn't accidentally send incomplete data
-        entry_to_send = f"{mac_normalized}:{ip}:{name}"
         if entry_to_send not in raw:
-            print(f"[DHCP] _update: ERROR - Final staticlist doesn't contain new entry!")
-            print(f"[DHCP] _update: Expected to find: {entry_to_send}")
-            print(f"[DHCP] _update: In: {raw}")
+            log.error("_update: Final staticlist doesn't contain new entry!")
+            log.error("_update: Expected to find: %s", entry_to_send)
+            log.error("_update: In: %s", raw)
             raise ValueError(f"[DHCP] _update: Attempted to save DHCP staticlist but new entry missing! Aborting to prevent data loss.")
-        
+
         # Prepare command to send raw string back
         commands = {
             "action_mode": "apply",
             "rc_service": "restart_dhcpd",
             "dhcp_staticlist": raw,
         }
-        
-        print(f"[DHCP] _update: Step 5 - Sending command to router (staticlist={len(raw)} bytes)...")
-        
+
+        log.debug("_update: Step 5 - Sending command to router (staticlist=%d bytes)...", len(raw))
+
         try:
             result = await router.async_api_command(commands, EndpointControl.COMMAND)
-            print(f"[DHCP] _update: Step 6 - Command succeeded! Result: {result}")
+            log.debug("_update: Step 6 - Command succeeded! Result: %s", result)
         except Exception as e:
-            print(f"[DHCP] _update: Step 6 - ERROR sending command to router: {e}")
-            print(f"[DHCP] _update: Failed command: {commands}")
+            log.error("_update: ERROR sending command to router: %s", e)
+            log.error("_update: Failed command: %s", commands)
             raise
-        
+
         return True
 
-    return await _with_router(host, username, password, use_ssl, _update)
+    result = await _with_router(host, username, password, use_ssl, _update)
+    _RESERVATIONS_CACHE.pop((host, username, use_ssl), None)
+    return result
+
+
+def _staticlist_is_legacy(raw: str) -> bool:
+    """True when the staticlist uses the legacy <MAC>IP>name format."""
+    return raw.lstrip()[:1] == "<"
+
+
+def _index_macs(entries_raw: List[str]) -> Dict[str, int]:
+    """Index raw staticlist entries by uppercase MAC for O(1) membership tests.
+
+    Maps each entry's MAC to its position in entries_raw, understanding both
+    MAC:IP:name and legacy <MAC>IP>name entries. Entries that don't start
+    with a recognizable MAC field are skipped (they can never match an
+    incoming reservation, which always carries a MAC).
+    """
+    index: Dict[str, int] = {}
+    for i, e in enumerate(entries_raw):
+        if e.startswith("<"):
+            gt = e.find(">")
+            if gt > 1:
+                index[e[1:gt].upper()] = i
+        elif _MAC_PREFIX_RE.match(e):
+            index[e[:17].upper()] = i
+        else:
+            head, sep, _ = e.partition(":")
+            if sep:
+                index[head.upper()] = i
+    return index
+
+
+async def _add_reservations_bulk(
+    host: str,
+    username: str,
+    password: str,
+    use_ssl: bool,
+    entries: List[Dict[str, str]],
+):
+    """Add/update many DHCP reservations with a single router round-trip.
+
+    Unlike calling _add_reservation once per entry (N fetches + N dhcpd
+    restarts), this fetches the staticlist once, merges all entries in
+    memory, and issues one command with one dhcpd restart.
+
+    Like _add_reservation, existing entries are never re-parsed/re-formatted;
+    we only splice into the raw string, so unknown formats survive untouched.
+    """
+    log.info("_add_reservations_bulk: Merging %d entries", len(entries))
+
+    async def _update(router: AsusRouter):
+        data = await router.async_api_hook("nvram_get(dhcp_staticlist)")
+        raw = _extract_staticlist(data)
+        log.debug("_bulk_update: Current staticlist: %d bytes", len(raw))
+
+        # Keep the router's own entry format on the way back out (see
+        # _add_reservation for why mixing them corrupts the list)
+        legacy = _staticlist_is_legacy(raw)
+        if legacy:
+            entries_raw = [f"<{e}" for e in raw.split("<") if e]
+            sep = ""
+        else:
+            entries_raw = raw.split("\t") if raw else []
+            sep = "\t"
+
+        # Index existing MACs once; each incoming entry is then one dict
+        # probe instead of a scan over the whole staticlist.
+        index = _index_macs(entries_raw)
+        changed = 0
+
+        for entry in entries:
+            mac_normalized = entry["mac"].upper()
+            ip = entry["ip"]
+            name = entry.get("name", "")
+            if legacy:
+                formatted = f"<{mac_normalized}>{ip}>{name}"
+            else:
+                formatted = f"{mac_normalized}:{ip}:{name}"
+
+            i = index.get(mac_normalized)
+            if i is not None:
+                if entries_raw[i] != formatted:
+                    log.debug("_bulk_update: Replacing %s with %s", entries_raw[i], formatted)
+                    entries_raw[i] = formatted
+                    changed += 1
+            else:
+                log.debug("_bulk_update: Appending %s", formatted)
+                index[mac_normalized] = len(entries_raw)
+                entries_raw.append(formatted)
+                changed += 1
+
+        if changed == 0:
+            log.debug("_bulk_update: All entries already current, skipping command")
+            return {"updated": 0, "total": len(entries_raw)}
+
+        merged = sep.join(e for e in entries_raw if e)
+
+        if not merged:
+            raise ValueError("[DHCP] _bulk_update: Final staticlist is empty - refusing to write!")
+
+        commands = {
+            "action_mode": "apply",
+            "rc_service": "restart_dhcpd",
+            "dhcp_staticlist": merged,
+        }
+
+        log.debug("_bulk_update: Sending %d changed entries in one command (%d bytes)...", changed, len(merged))
+        await router.async_api_command(commands, EndpointControl.COMMAND)
+        return {"updated": changed, "total": len(entries_raw)}
+
+    result = await _with_router(host, username, password, use_ssl, _update)
+    if result.get("updated"):
+        _RESERVATIONS_CACHE.pop((host, username, use_ssl), None)
+    return result
 
 
 @app.get("/health")
-def health():
+async def health():
     return jsonify({"status": "ok"})
 
 
 @app.post("/test")
-def test_connection():
-    payload = request.get_json(force=True) or {}
+async def test_connection():
+    payload = await request.get_json(force=True) or {}
     host = payload.get("host")
     username = payload.get("username")
     password = payload.get("password")
@@ -388,26 +788,23 @@ def test_connection():
         return jsonify({"success": False, "error": "Missing router credentials"}), 400
 
     try:
-        print(f"Testing router connection to {host} (SSL: {use_ssl})")
-        print(f"[DEBUG] Calling _get_reservations...")
-        reservations = run_async(_get_reservations(host, username, password, use_ssl))
-        print(f"Connection successful. Found {len(reservations)} reservations")
+        log.info("Testing router connection to %s (SSL: %s)", host, use_ssl)
+        # A connection test should always exercise the router, not the cache
+        reservations = await _get_reservations(host, username, password, use_ssl, fresh=True)
+        log.info("Connection successful. Found %d reservations", len(reservations))
         return jsonify({
             "success": True,
             "message": f"Connected successfully. Found {len(reservations)} DHCP reservations.",
-            "reservations": reservations,
+            "reservations": [r._asdict() for r in reservations],
         })
     except Exception as exc:
-        error_msg = str(exc)
-        print(f"Router connection failed: {error_msg}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"success": False, "error": error_msg}), 500
+        log.exception("Router connection failed: %s", exc)
+        return jsonify({"success": False, "error": str(exc)}), 500
 
 
 @app.post("/dhcp-reservations")
-def list_reservations():
-    payload = request.get_json(force=True) or {}
+async def list_reservations():
+    payload = await request.get_json(force=True) or {}
     host = payload.get("host")
     username = payload.get("username")
     password = payload.get("password")
@@ -416,16 +813,18 @@ def list_reservations():
     if not host or not username or not password:
         return jsonify({"error": "Missing router credentials"}), 400
 
+    fresh = request.args.get("fresh") == "1"
+
     try:
-        reservations = run_async(_get_reservations(host, username, password, use_ssl))
-        return jsonify({"success": True, "reservations": reservations})
+        reservations = await _get_reservations(host, username, password, use_ssl, fresh=fresh)
+        return jsonify({"success": True, "reservations": [r._asdict() for r in reservations]})
     except Exception as exc:
         return jsonify({"error": str(exc)}), 500
 
 
 @app.post("/dhcp-reservation")
-def add_reservation():
-    payload = request.get_json(force=True) or {}
+async def add_reservation():
+    payload = await request.get_json(force=True) or {}
     host = payload.get("host")
     username = payload.get("username")
     password = payload.get("password")
@@ -442,14 +841,43 @@ def add_reservation():
         return jsonify({"error": "Missing mac or ip"}), 400
 
     try:
-        print(f"[DHCP] add_reservation: Calling async _add_reservation...")
-        result = run_async(_add_reservation(host, username, password, use_ssl, mac, ip, name))
-        print(f"[DHCP] add_reservation: Success! Result: {result}")
+        result = await _add_reservation(host, username, password, use_ssl, mac, ip, name)
+        log.debug("add_reservation: Success! Result: %s", result)
         return jsonify({"success": True, "mac": mac.upper(), "ip": ip, "name": name})
     except Exception as exc:
-        print(f"[DHCP] add_reservation: ERROR - {type(exc).__name__}: {exc}")
-        import traceback
-        traceback.print_exc()
+        log.exception("add_reservation: ERROR - %s: %s", type(exc).__name__, exc)
+        return jsonify({"error": f"{type(exc).__name__}: {str(exc)}"}), 500
+
+
+@app.post("/dhcp-reservations/bulk")
+async def add_reservations_bulk():
+    payload = await request.get_json(force=True) or {}
+    host = payload.get("host")
+    username = payload.get("username")
+    password = payload.get("password")
+    use_ssl = payload.get("useHttps", True)
+
+    reservations = payload.get("reservations")
+
+    if not host or not username or not password:
+        return jsonify({"error": "Missing router credentials"}), 400
+
+    if not isinstance(reservations, list) or not reservations:
+        return jsonify({"error": "Missing reservations list"}), 400
+
+    entries = []
+    for r in reservations:
+        mac = (r.get("mac") or "").strip() if isinstance(r, dict) else ""
+        ip = (r.get("ip") or "").strip() if isinstance(r, dict) else ""
+        if not mac or not ip:
+            return jsonify({"error": f"Entry missing mac or ip: {r}"}), 400
+        entries.append({"mac": mac, "ip": ip, "name": (r.get("name") or "").strip()})
+
+    try:
+        result = await _add_reservations_bulk(host, username, password, use_ssl, entries)
+        return jsonify({"success": True, **result})
+    except Exception as exc:
+        log.exception("add_reservations_bulk: ERROR - %s: %s", type(exc).__name__, exc)
         return jsonify({"error": f"{type(exc).__name__}: {str(exc)}"}), 500
 
 